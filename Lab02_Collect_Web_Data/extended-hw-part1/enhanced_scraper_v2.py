@@ -1,28 +1,99 @@
+import asyncio
+import csv
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
+from lxml import etree
+from lxml import html as lxml_html
 import pandas as pd
 import time
 import re
+from datetime import datetime
 from urllib.parse import urljoin, urlparse
 
+# Optional on-disk HTTP cache - repeat runs send conditional GETs and serve
+# unchanged responses from SQLite instead of re-downloading them
+try:
+    import requests_cache
+    requests_cache.install_cache('vnexpress_cache', backend='sqlite', expire_after=3600)
+except ImportError:
+    pass
+
+# Concurrency settings for article fetches
+ARTICLE_CONCURRENCY = 8   # max in-flight article requests per page
+ARTICLE_RPS = 2.0         # polite ceiling on article requests per second
+
+# Shared HTTP session for listing pages - keep-alive + pooled connections
+SESSION = requests.Session()
+SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+})
+SESSION.mount('https://', HTTPAdapter(
+    pool_connections=10, pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 503])
+))
+
+class RateLimiter:
+    """Token-bucket pacing for the sequential listing-page fetches"""
+    def __init__(self, rps):
+        self.min_interval = 1.0 / rps
+        self.next_ok = 0.0
+    
+    def wait(self):
+        now = time.monotonic()
+        if now < self.next_ok:
+            time.sleep(self.next_ok - now)
+        self.next_ok = max(self.next_ok, now) + self.min_interval
+
+PAGE_LIMITER = RateLimiter(0.5)  # listing pages: one every 2 seconds on average
+
+# Precompiled patterns - these run once per title and article body
+_WS_RE = re.compile(r'\s+')
+_SENT_RE = re.compile(r'[.!?]+')
+
+# Compiled once; runs in C for every article body
+_PD_XPATH = etree.XPath('.//p|.//div')
+
 def clean_text(text):
     """Clean and normalize text content"""
     if not text:
         return ""
     # Remove extra whitespace and newlines
-    text = re.sub(r'\s+', ' ', text.strip())
-    return text
+    return _WS_RE.sub(' ', text.strip())
+
+class AsyncRateLimiter:
+    """Cap the average request rate shared by concurrent fetch tasks"""
+    def __init__(self, rps):
+        self.min_interval = 1.0 / rps
+        self.next_ok = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            if now < self.next_ok:
+                await asyncio.sleep(self.next_ok - now)
+            self.next_ok = max(self.next_ok, time.monotonic()) + self.min_interval
 
-def extract_article_content(url):
-    """Extract the main content from a VnExpress article"""
+async def fetch_article(session, url, limiter):
+    """Fetch a VnExpress article and extract the main content"""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
+        body = b""
+        for attempt in range(3):
+            await limiter.wait()
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                if response.status in (429, 503) and attempt < 2:
+                    # Throttled - back off exponentially and try again
+                    await asyncio.sleep(2 ** attempt)
+                    continue
+                response.raise_for_status()
+                body = await response.read()
+                break
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # Parse with lxml directly - much faster than going through BeautifulSoup wrappers
+        doc = lxml_html.fromstring(body)
         
         # VnExpress article content is typically in these selectors
         content_selectors = [
@@ -34,11 +105,11 @@ def extract_article_content(url):
         
         content = ""
         for selector in content_selectors:
-            content_div = soup.select_one(selector)
-            if content_div:
-                # Get all paragraph text
-                paragraphs = content_div.find_all(['p', 'div'])
-                content = ' '.join([p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)])
+            nodes = doc.cssselect(selector)
+            if nodes:
+                # Get all paragraph text (pure C traversal, no BS4 objects)
+                paragraphs = _PD_XPATH(nodes[0])
+                content = ' '.join(p.text_content().strip() for p in paragraphs if p.text_content().strip())
                 break
         
         return clean_text(content)
@@ -47,13 +118,39 @@ def extract_article_content(url):
         print(f"Error extracting content from {url}: {e}")
         return ""
 
+async def fetch_articles(urls, cache=None):
+    """Fetch a batch of article URLs concurrently, skipping already-seen URLs"""
+    if cache is None:
+        cache = {}
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    }
+    limiter = AsyncRateLimiter(ARTICLE_RPS)
+    semaphore = asyncio.Semaphore(ARTICLE_CONCURRENCY)
+    connector = aiohttp.TCPConnector(limit_per_host=ARTICLE_CONCURRENCY, keepalive_timeout=30)
+    
+    async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+        async def bounded_fetch(url):
+            async with semaphore:
+                return await fetch_article(session, url, limiter)
+        
+        # Only hit the network for URLs we have not fetched before
+        new_urls = []
+        for url in urls:
+            if url not in cache and url not in new_urls:
+                new_urls.append(url)
+        
+        contents = await asyncio.gather(*(bounded_fetch(url) for url in new_urls))
+        cache.update(zip(new_urls, contents))
+        return [cache[url] for url in urls]
+
 def simple_summarize(text, max_sentences=3):
     """Simple extractive summarization - takes first few sentences"""
     if not text:
         return ""
     
     # Split into sentences
-    sentences = re.split(r'[.!?]+', text)
+    sentences = _SENT_RE.split(text)
     sentences = [s.strip() for s in sentences if s.strip()]
     
     # Take first few sentences as summary
@@ -84,11 +181,14 @@ def scrape_vnexpress_categories(max_pages=3, articles_per_page=5):
         ("Số hóa", "https://vnexpress.net/so-hoa")
     ]
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-    }
-    
-    all_articles_data = []
+    # Stream rows straight to CSV so a mid-run crash keeps what we already scraped
+    csv_filename = f"vnexpress_articles_categories_{max_pages}pages.csv"
+    fieldnames = ['page', 'category', 'title', 'link', 'content_preview', 'summary', 'content_length', 'scraped_at']
+    csv_file = open(csv_filename, 'w', newline='', encoding='utf-8')
+    writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
+    writer.writeheader()
+    total_articles = 0
+    article_cache = {}  # article URL -> extracted content, reused across categories
     
     # Use different categories as "pages" to get variety
     for page_num in range(1, min(max_pages + 1, len(categories) + 1)):
@@ -97,32 +197,17 @@ def scrape_vnexpress_categories(max_pages=3, articles_per_page=5):
             
             print(f"\n📄 Scraping page {page_num} - {category_name}: {url}")
             
-            response = requests.get(url, headers=headers, timeout=10)
+            PAGE_LIMITER.wait()
+            response = SESSION.get(url, timeout=10)
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, "html.parser")
-            
-            # Find article titles and links with multiple selectors
-            title_elements = []
-            
-            # Try different selectors for different page layouts
-            selectors = [
-                "h3.title-news",
-                "h2.title-news", 
-                "h3.title_news",
-                "h2.title_news",
-                ".item-news h3",
-                ".item-news h2",
-                ".title-news",
-                "article h3",
-                "article h2"
-            ]
+            soup = BeautifulSoup(response.content, "lxml")
             
-            for selector in selectors:
-                elements = soup.select(selector)
-                if elements:
-                    title_elements = elements
-                    print(f"✅ Found articles using selector: {selector}")
-                    break
+            # Find article titles and links - one grouped selector covers all
+            # known page layouts in a single tree walk (matches are deduped)
+            title_elements = soup.select(
+                "h3.title-news, h2.title-news, h3.title_news, h2.title_news, "
+                ".item-news h3, .item-news h2, .title-news, article h3, article h2"
+            )
             
             print(f"📰 Found {len(title_elements)} articles on {category_name}")
             
@@ -130,13 +215,13 @@ def scrape_vnexpress_categories(max_pages=3, articles_per_page=5):
                 print(f"❌ No articles found on {category_name}, skipping...")
                 continue
             
-            # Process articles from this category
-            page_articles = []
+            # Collect (title, link) pairs from this category first
+            pending_articles = []
             for i, title_element in enumerate(title_elements[:articles_per_page]):
                 try:
                     # Extract title
                     title = clean_text(title_element.get_text())
-                    
+
                     # Extract link
                     link_element = title_element.find('a') or title_element.find_parent('a')
                     if not link_element:
@@ -145,65 +230,65 @@ def scrape_vnexpress_categories(max_pages=3, articles_per_page=5):
                         while parent and not link_element:
                             link_element = parent.find('a')
                             parent = parent.parent
-                    
+
                     if link_element and link_element.get('href'):
                         article_url = link_element.get('href')
-                        
+
                         # Make sure it's a full URL
                         if article_url.startswith('/'):
                             article_url = urljoin("https://vnexpress.net", article_url)
-                        
-                        print(f"📖 Processing {category_name}, article {i+1}: {title[:50]}...")
-                        
-                        # Extract article content
-                        content = extract_article_content(article_url)
-                        
-                        # Generate summary
-                        summary = simple_summarize(content)
-                        
-                        article_data = {
-                            'page': page_num,
-                            'category': category_name,
-                            'title': title,
-                            'link': article_url,
-                            'content_preview': content[:200] + "..." if len(content) > 200 else content,
-                            'summary': summary,
-                            'content_length': len(content),
-                            'scraped_at': pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
-                        }
-                        
-                        page_articles.append(article_data)
-                        all_articles_data.append(article_data)
-                        
-                        # Be respectful to the server
-                        time.sleep(1)
+
+                        pending_articles.append((title, article_url))
                     else:
                         print(f"⚠️ No link found for article: {title[:50]}...")
-                    
+
                 except Exception as e:
                     print(f"❌ Error processing {category_name}, article {i+1}: {e}")
                     continue
+
+            # Fetch all article bodies for this category concurrently
+            print(f"📖 Fetching {len(pending_articles)} articles from {category_name} concurrently...")
+            contents = asyncio.run(fetch_articles([article_url for _, article_url in pending_articles], article_cache))
+
+            # One formatted timestamp per page is plenty of resolution
+            scraped_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            page_articles = []
+            for (title, article_url), content in zip(pending_articles, contents):
+                # Generate summary
+                summary = simple_summarize(content)
+                
+                content_length = len(content)
+                preview = content[:200] + "..." if content_length > 200 else content
+
+                article_data = {
+                    'page': page_num,
+                    'category': category_name,
+                    'title': title,
+                    'link': article_url,
+                    'content_preview': preview,
+                    'summary': summary,
+                    'content_length': content_length,
+                    'scraped_at': scraped_at
+                }
+
+                writer.writerow(article_data)
+                csv_file.flush()
+                page_articles.append(article_data)
+                total_articles += 1
             
             print(f"✅ Completed {category_name}: {len(page_articles)} articles processed")
-            
-            # Add delay between categories
-            if page_num < max_pages:
-                print("⏳ Waiting before next category...")
-                time.sleep(2)
                 
         except Exception as e:
             print(f"❌ Error scraping {category_name}: {e}")
             continue
     
-    # Create DataFrame and save to CSV
-    if all_articles_data:
-        df = pd.DataFrame(all_articles_data)
-        
-        # Save to CSV
-        csv_filename = f"vnexpress_articles_categories_{max_pages}pages.csv"
-        df.to_csv(csv_filename, index=False, encoding='utf-8')
+    csv_file.close()
+    
+    # Re-read the streamed CSV only for the summary printouts
+    if total_articles:
+        df = pd.read_csv(csv_filename)
         
-        print(f"\n🎉 Successfully saved {len(all_articles_data)} articles from {max_pages} categories to {csv_filename}")
+        print(f"\n🎉 Successfully saved {total_articles} articles from {max_pages} categories to {csv_filename}")
         print(f"📊 Columns: {list(df.columns)}")
         print(f"📈 Average content length: {df['content_length'].mean():.0f} characters")
         print(f"📄 Articles per category breakdown:")
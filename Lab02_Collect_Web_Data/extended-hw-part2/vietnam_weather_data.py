@@ -1,11 +1,52 @@
 import requests
+from requests.adapters import HTTPAdapter
+import numpy as np
 import pandas as pd
 import json
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson  # Rust JSON codec, several times faster than stdlib json
+except ImportError:
+    orjson = None
+
 from datetime import datetime
+import matplotlib
+matplotlib.use('Agg')  # headless rendering - must run before pyplot is imported
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 from matplotlib.patches import Rectangle
 
+# Optional on-disk HTTP cache - repeat runs send conditional GETs and serve
+# unchanged responses from SQLite instead of re-downloading them
+try:
+    import requests_cache
+    requests_cache.install_cache('open_meteo_cache', backend='sqlite', expire_after=600)
+except ImportError:
+    pass
+
+# Shared HTTP session so all API calls reuse one pooled HTTPS connection
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+
+# 16-point compass rose used for wind direction names
+_DIR_NAMES = np.array(["N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE",
+                       "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW"])
+
+def wind_direction_names(degrees):
+    """Vectorized compass names for a Series of wind directions in degrees"""
+    deg = degrees.to_numpy(dtype="float64")
+    idx = np.mod(np.round(np.nan_to_num(deg) / 22.5).astype("int64"), 16)
+    return np.where(np.isnan(deg), "Unknown", _DIR_NAMES[idx])
+
+# Vietnamese cities with their coordinates
+CITIES = {
+    "Hà Nội": {"lat": 21.0285, "lon": 105.8542},
+    "Hồ Chí Minh": {"lat": 10.8231, "lon": 106.6297},
+    "Đà Nẵng": {"lat": 16.0471, "lon": 108.2068},
+    "Quy Nhơn": {"lat": 13.7563, "lon": 109.2297}
+}
+
 def get_weather_data(city_name, latitude, longitude):
     """Get weather data for a specific city using Open-Meteo API"""
     print(f"🌤️ Fetching weather data for {city_name}...")
@@ -21,58 +62,58 @@ def get_weather_data(city_name, latitude, longitude):
     }
     
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = SESSION.get(url, params=params, timeout=10)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content) if orjson else response.json()
         
-        # Create hourly data DataFrame
+        # Create hourly data DataFrame straight from the JSON lists; the city
+        # label is a categorical (one small int code per row, not a string ref)
+        h = data["hourly"]
         hourly_df = pd.DataFrame({
-            "city": city_name,
-            "datetime": data["hourly"]["time"],
-            "temperature_c": data["hourly"]["temperature_2m"],
-            "humidity_percent": data["hourly"]["relative_humidity_2m"],
-            "wind_speed_kmh": data["hourly"]["wind_speed_10m"],
-            "wind_direction_deg": data["hourly"]["wind_direction_10m"],
-            "wind_gusts_kmh": data["hourly"]["wind_gusts_10m"],
-            "weather_code": data["hourly"]["weather_code"]
+            "datetime": h["time"],
+            "temperature_c": h["temperature_2m"],
+            "humidity_percent": h["relative_humidity_2m"],
+            "wind_speed_kmh": h["wind_speed_10m"],
+            "wind_direction_deg": h["wind_direction_10m"],
+            "wind_gusts_kmh": h["wind_gusts_10m"],
+            "weather_code": h["weather_code"]
         })
+        hourly_df.insert(0, "city", pd.Categorical([city_name] * len(hourly_df), categories=list(CITIES)))
         
         # Calculate wind index (0-100 scale based on speed and gusts)
         # Wind index formula: combines wind speed and gusts with weighting
-        hourly_df["wind_index"] = (
-            (hourly_df["wind_speed_kmh"] * 0.7 + hourly_df["wind_gusts_kmh"] * 0.3) / 50 * 100
-        ).round(1).clip(0, 100)
-        
-        # Add wind direction categories
-        def get_wind_direction_name(degrees):
-            if pd.isna(degrees):
-                return "Unknown"
-            directions = ["N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE", 
-                         "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW"]
-            idx = round(degrees / 22.5) % 16
-            return directions[idx]
+        # (the /50*100 scaling folds down to *2)
+        wind_speed = hourly_df["wind_speed_kmh"].to_numpy()
+        wind_gusts = hourly_df["wind_gusts_kmh"].to_numpy()
+        hourly_df["wind_index"] = np.clip(
+            np.round((wind_speed * 0.7 + wind_gusts * 0.3) * 2.0, 1), 0.0, 100.0
+        )
         
-        hourly_df["wind_direction_name"] = hourly_df["wind_direction_deg"].apply(get_wind_direction_name)
+        # Add wind direction categories (vectorized, no per-row Python call)
+        hourly_df["wind_direction_name"] = wind_direction_names(hourly_df["wind_direction_deg"])
         
-        # Create daily data DataFrame
+        # Create daily data DataFrame the same way
+        d = data["daily"]
         daily_df = pd.DataFrame({
-            "city": city_name,
-            "date": data["daily"]["time"],
-            "temp_max_c": data["daily"]["temperature_2m_max"],
-            "temp_min_c": data["daily"]["temperature_2m_min"],
-            "precipitation_mm": data["daily"]["precipitation_sum"],
-            "wind_speed_max_kmh": data["daily"]["wind_speed_10m_max"],
-            "wind_gusts_max_kmh": data["daily"]["wind_gusts_10m_max"],
-            "wind_direction_dominant_deg": data["daily"]["wind_direction_10m_dominant"]
+            "date": d["time"],
+            "temp_max_c": d["temperature_2m_max"],
+            "temp_min_c": d["temperature_2m_min"],
+            "precipitation_mm": d["precipitation_sum"],
+            "wind_speed_max_kmh": d["wind_speed_10m_max"],
+            "wind_gusts_max_kmh": d["wind_gusts_10m_max"],
+            "wind_direction_dominant_deg": d["wind_direction_10m_dominant"]
         })
+        daily_df.insert(0, "city", pd.Categorical([city_name] * len(daily_df), categories=list(CITIES)))
         
         # Calculate daily wind index
-        daily_df["wind_index_max"] = (
-            (daily_df["wind_speed_max_kmh"] * 0.7 + daily_df["wind_gusts_max_kmh"] * 0.3) / 50 * 100
-        ).round(1).clip(0, 100)
+        wind_speed_max = daily_df["wind_speed_max_kmh"].to_numpy()
+        wind_gusts_max = daily_df["wind_gusts_max_kmh"].to_numpy()
+        daily_df["wind_index_max"] = np.clip(
+            np.round((wind_speed_max * 0.7 + wind_gusts_max * 0.3) * 2.0, 1), 0.0, 100.0
+        )
         
         # Add dominant wind direction names for daily data
-        daily_df["wind_direction_dominant_name"] = daily_df["wind_direction_dominant_deg"].apply(get_wind_direction_name)
+        daily_df["wind_direction_dominant_name"] = wind_direction_names(daily_df["wind_direction_dominant_deg"])
         
         print(f"✅ Successfully fetched data for {city_name}")
         return hourly_df, daily_df, data
@@ -91,8 +132,14 @@ def create_temperature_charts(hourly_data, daily_data):
     plt.rcParams['font.size'] = 10
     
     # Convert datetime strings to datetime objects
-    hourly_data['datetime_parsed'] = pd.to_datetime(hourly_data['datetime'])
-    daily_data['date_parsed'] = pd.to_datetime(daily_data['date'])
+    # Open-Meteo always returns these exact layouts, so give pandas the format
+    # up front and take the C parser path instead of per-value format inference
+    hourly_data['datetime_parsed'] = pd.to_datetime(hourly_data['datetime'], format='%Y-%m-%dT%H:%M', cache=True)
+    daily_data['date_parsed'] = pd.to_datetime(daily_data['date'], format='%Y-%m-%d', cache=True)
+    
+    # Split each frame by city once instead of re-masking inside every chart loop
+    hourly_by_city = dict(tuple(hourly_data.groupby('city', sort=False)))
+    daily_by_city = dict(tuple(daily_data.groupby('city', sort=False)))
     
     # Create subplots
     fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
@@ -108,8 +155,7 @@ def create_temperature_charts(hourly_data, daily_data):
     
     # Chart 1: Hourly Temperature Trends
     ax1.set_title('Hourly Temperature Trends (7 Days)', fontweight='bold')
-    for city in hourly_data['city'].unique():
-        city_data = hourly_data[hourly_data['city'] == city]
+    for city, city_data in hourly_by_city.items():
         ax1.plot(city_data['datetime_parsed'], city_data['temperature_c'], 
                 label=city, color=city_colors[city], linewidth=2, alpha=0.8)
     
@@ -126,8 +172,7 @@ def create_temperature_charts(hourly_data, daily_data):
     x_offset = 0
     bar_width = 0.2
     
-    for i, city in enumerate(daily_data['city'].unique()):
-        city_data = daily_data[daily_data['city'] == city]
+    for i, (city, city_data) in enumerate(daily_by_city.items()):
         x_pos = range(len(city_data))
         x_pos_adjusted = [x + i * bar_width for x in x_pos]
         
@@ -144,8 +189,7 @@ def create_temperature_charts(hourly_data, daily_data):
     
     # Chart 3: Temperature vs Wind Speed Scatter
     ax3.set_title('Temperature vs Wind Speed', fontweight='bold')
-    for city in hourly_data['city'].unique():
-        city_data = hourly_data[hourly_data['city'] == city]
+    for city, city_data in hourly_by_city.items():
         ax3.scatter(city_data['temperature_c'], city_data['wind_speed_kmh'], 
                    label=city, color=city_colors[city], alpha=0.6, s=20)
     
@@ -176,11 +220,11 @@ def create_temperature_charts(hourly_data, daily_data):
     
     # Save the chart
     chart_filename = "vietnam_weather_data_charts.png"
-    plt.savefig(chart_filename, dpi=300, bbox_inches='tight', facecolor='white')
+    plt.savefig(chart_filename, dpi=150, bbox_inches='tight', facecolor='white')
     print(f"📊 Temperature charts saved to: {chart_filename}")
     
-    # Show the plot
-    plt.show()
+    # Free the figure buffers right away
+    plt.close(fig)
     
     return chart_filename
 
@@ -189,28 +233,25 @@ def main():
     print("🇻🇳 Vietnam Weather Data Collection")
     print("=" * 50)
     
-    # Vietnamese cities with their coordinates
-    cities = {
-        "Hà Nội": {"lat": 21.0285, "lon": 105.8542},
-        "Hồ Chí Minh": {"lat": 10.8231, "lon": 106.6297},
-        "Đà Nẵng": {"lat": 16.0471, "lon": 108.2068},
-        "Quy Nhơn": {"lat": 13.7563, "lon": 109.2297}
-    }
+    cities = CITIES
     
     all_hourly_data = []
     all_daily_data = []
     all_raw_data = {}
     
-    # Collect data for each city
-    for city_name, coords in cities.items():
-        hourly_df, daily_df, raw_data = get_weather_data(
-            city_name, coords["lat"], coords["lon"]
-        )
-        
-        if hourly_df is not None and daily_df is not None:
-            all_hourly_data.append(hourly_df)
-            all_daily_data.append(daily_df)
-            all_raw_data[city_name] = raw_data
+    # Collect data for all cities in parallel - each call is an independent API round trip
+    with ThreadPoolExecutor(max_workers=len(cities)) as executor:
+        futures = {
+            city_name: executor.submit(get_weather_data, city_name, coords["lat"], coords["lon"])
+            for city_name, coords in cities.items()
+        }
+        for city_name, future in futures.items():
+            hourly_df, daily_df, raw_data = future.result()
+            
+            if hourly_df is not None and daily_df is not None:
+                all_hourly_data.append(hourly_df)
+                all_daily_data.append(daily_df)
+                all_raw_data[city_name] = raw_data
     
     if all_hourly_data and all_daily_data:
         # Combine all data
@@ -235,10 +276,23 @@ def main():
         combined_daily.to_csv(daily_csv, index=False, encoding="utf-8")
         print(f"📊 Saved daily data to: {daily_csv}")
         
+        # Parquet copies are far smaller and much faster to reload for analysis
+        try:
+            combined_hourly.to_parquet(f"{base_filename}_hourly.parquet")
+            combined_daily.to_parquet(f"{base_filename}_daily.parquet")
+            print(f"📊 Saved Parquet copies to: {base_filename}_hourly.parquet / {base_filename}_daily.parquet")
+        except ImportError:
+            print("⚠️ pyarrow not installed, skipping Parquet output")
+        
         # Save raw JSON data
         json_file = f"{base_filename}_raw.json"
-        with open(json_file, "w", encoding="utf-8") as f:
-            json.dump(all_raw_data, f, ensure_ascii=False, indent=2)
+        if orjson:
+            # orjson emits bytes directly, so skip the str -> bytes encode
+            with open(json_file, "wb") as f:
+                f.write(orjson.dumps(all_raw_data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(json_file, "w", encoding="utf-8") as f:
+                json.dump(all_raw_data, f, ensure_ascii=False, indent=2)
         print(f"📊 Saved raw data to: {json_file}")
         
         # Display summary
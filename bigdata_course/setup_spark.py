@@ -3,23 +3,42 @@ Big Data Analytics Course - PySpark Configuration (Pip-based)
 Compatible with Ubuntu 25.04 and Python 3.13.3
 No full Spark installation required
 """
-import findspark
 import os
 
-# Configure for pip-installed PySpark (no SPARK_HOME needed)
+__all__ = ["ensure_spark"]
+
+# Configure for pip-installed PySpark (no SPARK_HOME needed) - cheap env-var
+# assignments, safe to run at import time
 os.environ['PYSPARK_PYTHON'] = '/usr/bin/python3'
 os.environ['PYSPARK_DRIVER_PYTHON'] = '/usr/bin/python3'
 
-# Initialize findspark to find pip-installed PySpark
-findspark.init()
+_initialized = False
+
+def ensure_spark():
+    """Locate pip-installed PySpark and verify it imports.
+
+    Call this right before building a SparkContext/SparkSession. findspark
+    walks the filesystem for Spark jars and pulls in py4j, which costs up to
+    a second, so it must not run just because a notebook imports this module.
+    """
+    global _initialized
+    if _initialized:
+        return
+
+    import findspark
+    findspark.init()
+
+    print("🎓 Big Data Analytics Course Environment (PySpark-only)")
+    print(f"✅ Python: {os.environ.get('PYSPARK_PYTHON')}")
 
-print("🎓 Big Data Analytics Course Environment (PySpark-only)")
-print(f"✅ Python: {os.environ.get('PYSPARK_PYTHON')}")
-print("✅ PySpark ready for labs!")
+    # Test PySpark functionality
+    try:
+        from pyspark import SparkContext
+        print("✅ SparkContext import successful")
+        print("✅ PySpark ready for labs!")
+        _initialized = True
+    except ImportError as e:
+        print(f"❌ PySpark import error: {e}")
 
-# Test PySpark functionality
-try:
-    from pyspark import SparkContext
-    print("✅ SparkContext import successful")
-except ImportError as e:
-    print(f"❌ PySpark import error: {e}")
+if __name__ == "__main__":
+    ensure_spark()